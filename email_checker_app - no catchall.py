@@ -1,72 +1,162 @@
 import streamlit as st
 import pandas as pd
-import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import asyncio
+import functools
+import threading
+import io
+from collections import defaultdict, deque
 from email_validator import validate_email, EmailNotValidError
+import dns.exception
 import dns.resolver
-
-DISPOSABLE_DOMAINS = {'mailinator.com', '10minutemail.com', 'tempmail.com', 'yopmail.com'}
-TYPO_DOMAINS = {'gamil.com', 'yaho.com', 'hotnail.com'}
-
-def has_mx_record(domain):
+import dns.asyncresolver
+from cachetools import TTLCache
+
+# read-only lookup tables, kept lower-case to match the lower-cased domain
+DISPOSABLE_DOMAINS = frozenset({'mailinator.com', '10minutemail.com', 'tempmail.com', 'yopmail.com'})
+TYPO_DOMAINS = frozenset({'gamil.com', 'yaho.com', 'hotnail.com'})
+CONCURRENCY = 20  # emails checked at once
+LIVE_ROWS = 50  # newest results shown while a batch runs
+
+# one resolver for the whole batch; lookups run concurrently on the event loop.
+# Pinned to Cloudflare so each query goes straight to a fast recursive
+# resolver instead of whatever chain /etc/resolv.conf points at.
+resolver = dns.asyncresolver.Resolver(configure=False)
+resolver.nameservers = ['1.1.1.1', '1.0.0.1']
+resolver.lifetime = 2.0  # bounded wait per domain; timeouts become "Maybe Send"
+
+@st.cache_resource
+def _mx_cache():
+    """
+    domain -> MX hosts, so repeated domains resolve once; bounded, and
+    expires after a day like typical MX TTLs, so stale answers heal.
+    Built once per server process (module code re-runs on every rerun) and
+    shared by all sessions, hence the lock.
+    """
+    return TTLCache(maxsize=10_000, ttl=86400), threading.Lock()
+
+mx_cache, mx_lock = _mx_cache()
+
+async def _resolve_mx(domain):
+    """MX hosts ([] if the domain has none), or None on a transient failure."""
     try:
-        dns.resolver.resolve(domain, 'MX')
-        return True
-    except Exception:
-        return False
-
-def check_email(email):
-    email = email.strip().replace(';', '')  # Clean email
+        answer = await resolver.resolve(domain, 'MX', raise_on_no_answer=False)
+    except dns.resolver.NXDOMAIN:
+        return []
+    except dns.exception.DNSException:  # timeout, SERVFAIL / no nameservers
+        return None
+    if answer.rrset is None:
+        return []
+    return [r.exchange.to_text() for r in answer.rrset]
+
+async def has_mx_record(domain):
+    """True / False, or None when DNS didn't answer (not cached, retried next time)."""
+    with mx_lock:
+        mx = mx_cache.get(domain)
+    if mx is None:
+        mx = await _resolve_mx(domain)
+        if mx is None:
+            return None
+        with mx_lock:
+            mx_cache[domain] = mx
+    return bool(mx)
+
+@functools.lru_cache(maxsize=100_000)
+def _parse(email):
+    """Run validate_email once per distinct address → (domain, None) or (None, error)."""
+    try:
+        # syntax only – the per-domain MX lookup in async_batch is the (single) DNS check
+        valid = validate_email(email, check_deliverability=False)
+        return valid['domain'].lower(), None
+    except EmailNotValidError as e:
+        return None, str(e)
+
+def _needs_dns(domain):
+    """Only domains that pass the cheap offline checks cost a DNS query."""
+    return (domain is not None and domain not in DISPOSABLE_DOMAINS
+            and domain not in TYPO_DOMAINS)
+
+def check_email(email, domain, has_mx=None):
+    """Verdict for one cleaned address, given its parsed domain and MX answer."""
     result = {
         'email': email,
         'validation_status': '',
         'validation_analysis': ''
     }
 
-    try:
-        valid = validate_email(email)
-        domain = valid['domain']
-        has_mx = has_mx_record(domain)
-
-        if not has_mx:
-            result['validation_status'] = 'Do Not Send'
-            result['validation_analysis'] = 'No MX'
-        elif domain.lower() in DISPOSABLE_DOMAINS:
-            result['validation_status'] = 'Do Not Send'
-            result['validation_analysis'] = 'Disposable'
-        else:
-            result['validation_status'] = 'Okay to Send'
-            result['validation_analysis'] = 'Accepted'
-
-    except EmailNotValidError:
+    if domain is None:
         result['validation_status'] = 'Do Not Send'
         result['validation_analysis'] = 'Invalid Syntax'
+    elif domain in DISPOSABLE_DOMAINS:
+        result['validation_status'] = 'Do Not Send'
+        result['validation_analysis'] = 'Disposable'
+    elif domain in TYPO_DOMAINS:
+        result['validation_status'] = 'Do Not Send'
+        result['validation_analysis'] = 'Possible Typo'
+    elif has_mx is None:
+        result['validation_status'] = 'Maybe Send'
+        result['validation_analysis'] = 'DNS Timeout'
+    elif not has_mx:
+        result['validation_status'] = 'Do Not Send'
+        result['validation_analysis'] = 'No MX'
+    else:
+        result['validation_status'] = 'Okay to Send'
+        result['validation_analysis'] = 'Accepted'
 
     return result
 
-
+async def async_batch(emails, on_done=None):
+    """
+    Check all emails; results keep input order. Emails are grouped by domain,
+    so each distinct domain is looked up once (CONCURRENCY at a time) and its
+    answer is shared by every address on it.
+    `on_done(done, result)` is called as each check finishes.
+    """
+    cleaned = [e.strip().replace(';', '') for e in emails]
+    groups = defaultdict(list)  # domain -> indexes of its emails
+    for idx, email in enumerate(cleaned):
+        groups[_parse(email)[0]].append(idx)
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(domain, idxs):
+        has_mx = None
+        if _needs_dns(domain):
+            async with sem:
+                has_mx = await has_mx_record(domain)
+        return [(idx, check_email(cleaned[idx], domain, has_mx)) for idx in idxs]
+
+    results = [None] * len(emails)
+    tasks = [one(domain, idxs) for domain, idxs in groups.items()]
+    done = 0
+    for fut in asyncio.as_completed(tasks):
+        for idx, result in await fut:
+            results[idx] = result
+            done += 1
+            if on_done:
+                on_done(done, result)
+    return results
+
+@st.cache_data(show_spinner=False)
+def parse_csv(data: bytes) -> list:
+    """First CSV column as cleaned strings; keyed on the upload's bytes."""
     try:
-        valid = validate_email(email)
-        domain = valid['domain']
-        result['is_valid'] = True
-    except EmailNotValidError:
-        result['risk_flag'] = 'invalid_syntax'
-        return result
-
-    domain_lower = domain.lower()
-
-    if domain_lower in DISPOSABLE_DOMAINS:
-        result['is_disposable'] = True
-        result['risk_flag'] = 'disposable'
-
-    if domain_lower in TYPO_DOMAINS:
-        result['risk_flag'] = 'possible_typo'
-
-    if has_mx_record(domain_lower):
-        result['has_mx'] = True
-    else:
-        result['risk_flag'] = 'no_mx'
-
-    return result
+        df = pd.read_csv(io.BytesIO(data), usecols=[0], names=["email"], skiprows=1,
+                         engine="pyarrow", dtype_backend="pyarrow")
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, pa.ArrowInvalid):
+        # ragged rows or a header-only file: the C engine still reads column 0
+        df = pd.read_csv(io.BytesIO(data), usecols=[0], names=["email"], skiprows=1,
+                         engine="c", dtype_backend="pyarrow")
+    # Arrow kernels: clean the whole column in C, no per-row Python
+    col = pa.array(df['email'].dropna().astype("string[pyarrow]").array)
+    return pc.utf8_trim_whitespace(pc.replace_substring(col, ';', '')).to_pylist()
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Arrow's C++ writer straight into bytes, no intermediate Python str."""
+    buf = io.BytesIO()
+    pcsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
 
 # Streamlit UI
 st.set_page_config(page_title="Local Email Checker", layout="centered")
@@ -79,11 +169,7 @@ emails = []
 if input_method == "Upload CSV":
     uploaded_file = st.file_uploader("Upload a CSV file with an 'email' column", type="csv")
     if uploaded_file:
-        df = pd.read_csv(uploaded_file, usecols=[0], names=["email"], skiprows=1)
-        if 'email' not in df.columns:
-            st.error("CSV must have a column named 'email'.")
-        else:
-            emails = df['email'].dropna().astype(str).str.replace(';', '', regex=False).str.strip().tolist()
+        emails = parse_csv(uploaded_file.getvalue())
 
 elif input_method == "Paste Emails":
     pasted = st.text_area("Paste email addresses (one per line)")
@@ -91,17 +177,39 @@ elif input_method == "Paste Emails":
         emails = [line.strip() for line in pasted.strip().split('\n') if line.strip()]
 
 if emails:
+    key = tuple(emails)
     if st.button("Check Emails"):
-        checked_results = []
-        with st.spinner("Checking..."):
-            for email in emails:
-                checked_results.append(check_email(email))
-                time.sleep(0.5)  # Safety delay
+        unique = list(dict.fromkeys(emails))  # duplicates are checked once
+        progress_bar = st.progress(0)
+        step = max(1, len(unique) // 100)  # ~100 UI updates at most
+        inv = 1.0 / len(unique)
+        notice = st.empty()
+        table = st.empty()
+        # live view: only the newest rows, redrawn at the ~1% progress cadence,
+        # so each redraw stays small; the full table is drawn once, at the end
+        recent = deque(maxlen=LIVE_ROWS)
+
+        def show_progress(done, result):
+            recent.append(result)
+            if done % step == 0 or done == len(unique):
+                progress_bar.progress(done * inv)
+                table.dataframe(pd.DataFrame(recent))
 
-        result_df = pd.DataFrame(checked_results)
+        with st.spinner("Checking..."):
+            by_email = dict(zip(unique, asyncio.run(async_batch(unique, show_progress))))
+        progress_bar.progress(1.0)
+
+        # one final frame, in input order (duplicates included), replaces the live view
+        result_df = pd.DataFrame([by_email[e] for e in emails])
+        notice.success("Done! See below 👇")
+        table.dataframe(result_df)
+        # kept per session, so the rerun a download triggers doesn't drop it
+        st.session_state["checked"] = (key, result_df)
+    elif st.session_state.get("checked", (None,))[0] == key:
+        result_df = st.session_state["checked"][1]
         st.success("Done! See below 👇")
-
         st.dataframe(result_df)
 
-        csv = result_df.to_csv(index=False).encode('utf-8')
+    if st.session_state.get("checked", (None,))[0] == key:
+        csv = to_csv_bytes(result_df)
         st.download_button("📥 Download Results CSV", csv, "checked_emails.csv", "text/csv")
@@ -1,13 +1,20 @@
 # email_checker_app.py
 #
-# pip install streamlit email_validator dnspython requests python-dotenv
+# pip install streamlit email_validator dnspython requests diskcache cachetools pyarrow python-dotenv
 # then:  streamlit run email_checker_app.py
 #
 # ─────────────────────────────────────────
 
-import streamlit as st, pandas as pd, time, requests, dns.resolver
+import streamlit as st, pandas as pd, time, requests, asyncio, io
+import pyarrow as pa, pyarrow.csv as pcsv
+import dns.resolver, dns.asyncresolver
 from email_validator import validate_email, EmailNotValidError
-import smtplib, random, string, socket, functools, datetime as dt
+import smtplib, secrets, socket, functools, threading, difflib, queue, atexit, datetime as dt
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import diskcache
+from cachetools import TTLCache
 
 # ─────────────────────────  CONFIG  ──────────────────────────
 DISPOSABLE_URL = ("https://raw.githubusercontent.com/"
@@ -23,99 +30,408 @@ TYPO_URL       = ("https://raw.githubusercontent.com/"
 FALLBACK_TYPOS = {"gamil.com": "gmail.com", "hotnail.com": "hotmail.com",
                   "yaho.com": "yahoo.com"}
 
-SMTP_TIMEOUT   = 8        # seconds for SMTP socket
-DNS_TIMEOUT    = 4        # seconds for DNS look-ups
+# big mailbox providers: always have MX, never useful catch-all targets and
+# they greylist / rate-limit SMTP probes → skip DNS + SMTP for them
+KNOWN_PROVIDERS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.uk", "outlook.com",
+    "hotmail.com", "live.com", "icloud.com", "me.com", "aol.com",
+    "proton.me", "protonmail.com"})
+TYPO_CUTOFF    = 0.88     # similarity for "did you mean <provider>?" hints
+# real providers that sit closer to a big one than true typos do
+# (mail.com ~ gmail.com scores 0.94, gmial.com only 0.89) – never hinted
+NOT_TYPOS = frozenset({"mail.com", "email.com", "ymail.com"})
+
+SMTP_TIMEOUT   = 4        # seconds for SMTP socket
+CONNECT_TIMEOUT = 2       # seconds for TCP connect + banner; dead MXs fail fast
+DNS_TIMEOUT    = 2        # seconds for DNS look-ups
+PROBE_BUDGET   = 6        # hard cap on SMTP seconds per probed domain
 CACHE_TTL      = 24*3600  # seconds between list refreshes
+MX_CACHE_TTL   = 3600     # on-disk result TTLs (seconds)
+DBL_CACHE_TTL  = 24*3600
+CA_CACHE_TTL   = 12*3600
+RETRY_TTL      = 300      # failed probes / DNS errors are retried after this
+DISK_CACHE_DIR = ".dns_cache"
+MAX_WORKERS    = 32       # parallel SMTP sessions
+SMTP_POOL_SIZE = 64       # idle SMTP sessions kept for the next run
+SMTP_POOL_IDLE = 60       # seconds before an idle session is dropped
+DNS_CONCURRENCY = 64      # in-flight DNS queries
 # ─────────────────────────────────────────────────────────────
 
+# ---------- SHARED RESOURCES (survive script reruns) ---------
+# st.cache_resource keeps one object per server process instead of
+# rebuilding it on every rerun (module code re-executes each time)
+@st.cache_resource
+def _session() -> requests.Session:
+    """One pooled session: later downloads reuse the TLS connection."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                          max_retries=Retry(total=3, backoff_factor=0.3)))
+    return session
+
+@st.cache_resource(max_entries=8)
+def _resolver(nameservers: tuple[str, ...] = ()) -> dns.asyncresolver.Resolver:
+    """
+    One shared (asyncio) resolver per nameserver setting: queries are
+    multiplexed on the event loop and repeats come from its cache.
+    Bounded, since every distinct sidebar value builds one.
+    """
+    res = dns.asyncresolver.Resolver()
+    if nameservers:
+        res.nameservers = list(nameservers)
+    res.cache    = dns.resolver.LRUCache(10_000)
+    res.lifetime = DNS_TIMEOUT
+    res.timeout  = DNS_TIMEOUT
+    return res
+
+@st.cache_resource
+def _disk_cache() -> diskcache.Cache:
+    """DNS/SMTP results on disk, so restarts and code edits skip the network."""
+    return diskcache.Cache(DISK_CACHE_DIR)
+
+@st.cache_resource
+def _catch_all_caches() -> tuple[TTLCache, TTLCache, threading.Lock]:
+    """
+    Catch-all results by domain: verdicts are kept for hours, failed probes
+    (None) only for minutes so a network blip doesn't stick.
+    """
+    return (TTLCache(maxsize=10_000, ttl=CA_CACHE_TTL),
+            TTLCache(maxsize=10_000, ttl=RETRY_TTL),
+            threading.Lock())
+
+@st.cache_resource
+def _smtp_pool() -> tuple[dict, threading.Lock]:
+    """Idle SMTP sessions by MX pair → (smtp, parked_at); closed at exit."""
+    pool, lock = {}, threading.Lock()
+    atexit.register(lambda: [_smtp_close(srv) for srv, _ in list(pool.values())])
+    return pool, lock
+
+_SESSION = _session()
+_RES     = _resolver()
+DC       = _disk_cache()
+_CA_POS, _CA_NEG, _CA_LOCK = _catch_all_caches()
+_POOL, _POOL_LOCK = _smtp_pool()
+
 # ---------- CACHED LOADERS (run once per day) ----------------
-@st.cache_data(ttl=CACHE_TTL, show_spinner="Loading disposable-domain list…")
+# cache_resource: read-only data, shared as-is instead of copied per rerun
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner="Loading disposable-domain list…")
 def load_disposable():
-    resp = requests.get(DISPOSABLE_URL, timeout=15)
-    return set(resp.text.splitlines()) if resp.ok else set()
+    # streamed: the set is built line by line while the body arrives
+    with _SESSION.get(DISPOSABLE_URL, timeout=15, stream=True) as resp:
+        if not resp.ok:
+            return frozenset()
+        return frozenset(ln.strip().lower()
+                         for ln in resp.iter_lines(decode_unicode=True)
+                         if ln and not ln.startswith("#"))
 
-@st.cache_data(ttl=CACHE_TTL, show_spinner="Loading role-address list…")
+@st.cache_resource(ttl=CACHE_TTL, show_spinner="Loading role-address list…")
 def load_role():
-    resp = requests.get(ROLE_URL, timeout=15)
-    return set(resp.json()) if resp.ok else set()
+    resp = _SESSION.get(ROLE_URL, timeout=15)
+    return frozenset(r.lower() for r in resp.json()) if resp.ok else frozenset()
 
-@st.cache_data(ttl=CACHE_TTL, show_spinner="Loading typo list…")
+@st.cache_resource(ttl=CACHE_TTL, show_spinner="Loading typo list…")
 def load_typos():
-    resp = requests.get(TYPO_URL, timeout=15)
-    if resp.ok:
+    with _SESSION.get(TYPO_URL, timeout=15, stream=True) as resp:
+        if not resp.ok:
+            return FALLBACK_TYPOS
         mapping = {}
-        for ln in resp.text.splitlines():
+        for ln in resp.iter_lines(decode_unicode=True):
             if ":" in ln:
                 wrong, right = ln.split(":", 1)
-                mapping[wrong.strip()] = right.strip()
+                mapping[wrong.strip().lower()] = right.strip().lower()
         return mapping
-    return FALLBACK_TYPOS
 
 DISPOSABLE_SET = load_disposable()
 ROLE_SET       = load_role()
 TYPO_MAP       = load_typos()
 
 # ---------- UTILITIES ----------------------------------------
+_ICONS = {"Okay": "🟢 Okay to Send",
+          "DoNot": "🔴 Do Not Send",
+          "Maybe": "🟠 Maybe Send",
+          "Check": "🕐 Checking..."}
+
 def status_icon(status: str) -> str:
-    return {"Okay": "🟢 Okay to Send",
-            "DoNot": "🔴 Do Not Send",
-            "Maybe": "🟠 Maybe Send",
-            "Check": "🕐 Checking..."}.get(status, status)
+    return _ICONS.get(status, status)
 
-@functools.lru_cache(maxsize=10_000)
-def has_mx(domain: str) -> bool:
+async def mx_hosts(domain: str) -> tuple[str, ...] | None:
+    """
+    MX exchanges for domain, best preference first (empty if none), or
+    None when DNS gave no usable answer (timeout, SERVFAIL).
+    """
+    hit = DC.get(("mx", domain))
+    if hit is not None:
+        return hit
     try:
-        dns.resolver.resolve(domain, "MX", lifetime=DNS_TIMEOUT)
-        return True
+        answer = await _RES.resolve(domain, "MX")
+        ranked = sorted(answer, key=lambda r: r.preference)
+        hosts = (r.exchange.to_text().rstrip(".") for r in ranked)
+        hosts = tuple(h for h in hosts if h)              # "." = null MX
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        hosts = ()
     except Exception:
-        return False
+        return None                  # transient → don't remember it
+    DC.set(("mx", domain), hosts, expire=MX_CACHE_TTL)
+    return hosts
 
-@functools.lru_cache(maxsize=10_000)
-def is_blacklisted(domain: str) -> bool:
+async def is_blacklisted(domain: str) -> bool:
     """Query Spamhaus DBL; True if domain is listed."""
+    hit = DC.get(("dbl", domain))
+    if hit is not None:
+        return hit
+    # network error / refusal → treat as not blacklisted, but remember that
+    # only briefly so Spamhaus is asked again soon
+    listed, ttl = False, RETRY_TTL
     try:
-        dns.resolver.resolve(f"{domain}.dbl.spamhaus.org", "A", lifetime=DNS_TIMEOUT)
-        return True
+        answer = await _RES.resolve(f"{domain}.dbl.spamhaus.org", "A")
+        # 127.0.1.x = listed; 127.255.255.x = query refused (public
+        # resolver, rate limit) – not a listing
+        if not answer[0].address.startswith("127.255.255."):
+            listed, ttl = True, DBL_CACHE_TTL
     except dns.resolver.NXDOMAIN:
-        return False
+        ttl = DBL_CACHE_TTL
     except Exception:
-        # network error → treat as unknown (not blacklisted)
-        return False
+        pass
+    DC.set(("dbl", domain), listed, expire=ttl)
+    return listed
+
+_MISS = object()
+
+def recall_catch_all(domain: str):
+    """Cached catch-all result (memory, then disk), or _MISS."""
+    with _CA_LOCK:
+        for cache in (_CA_POS, _CA_NEG):
+            if domain in cache:
+                return cache[domain]
+    return DC.get(("ca", domain), default=_MISS)
+
+def remember_catch_all(domain: str, result: str | bool | None) -> None:
+    failed = result is None
+    with _CA_LOCK:
+        (_CA_NEG if failed else _CA_POS)[domain] = result
+    DC.set(("ca", domain), result, expire=RETRY_TTL if failed else CA_CACHE_TTL)
 
 @functools.lru_cache(maxsize=10_000)
-def is_catch_all(domain: str) -> str | bool:
-    """Return 'maybe' when server accepts random address, else False."""
+def mx_address(hosts: tuple[str, ...]) -> str:
+    """
+    Resolve the candidate MX hosts concurrently and return the IPv4 address
+    of whichever answers first – any MX of a domain will do for a probe.
+    """
+    ex = ThreadPoolExecutor(max_workers=len(hosts))
+    try:
+        pending = {ex.submit(socket.getaddrinfo, h, 25, socket.AF_INET,
+                             socket.SOCK_STREAM) for h in hosts}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None and fut.result():
+                    return fut.result()[0][4][0]
+    finally:
+        ex.shutdown(wait=False)       # don't wait for the slower look-up
+    raise OSError(f"no address for {hosts}")
+
+def _smtp_session(hosts: tuple[str, ...]) -> smtplib.SMTP:
+    # one address, short connect timeout: an unreachable or tarpitting MX
+    # costs CONNECT_TIMEOUT once instead of SMTP_TIMEOUT per MX record
+    srv = smtplib.SMTP(timeout=CONNECT_TIMEOUT)
+    srv.connect(mx_address(hosts), 25)    # IP given → no resolver step here
+    srv.sock.settimeout(SMTP_TIMEOUT)
+    srv.helo("test.local")
+    return srv
+
+def _smtp_close(srv: smtplib.SMTP) -> None:
     try:
-        mx = dns.resolver.resolve(domain, "MX", lifetime=DNS_TIMEOUT)[0].exchange.to_text().rstrip(".")
-        srv = smtplib.SMTP(timeout=SMTP_TIMEOUT)
-        srv.connect(mx)
-        srv.helo("test.local")
-        srv.mail(f"probe@{domain}")
-        fake = ''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
-        code, _ = srv.rcpt(f"{fake}@{domain}")
         srv.quit()
-        return "maybe" if code == 250 else False
     except Exception:
-        return False
+        pass
 
+def _smtp_checkout(hosts: tuple[str, ...]) -> smtplib.SMTP | None:
+    """Take the parked session for these MX hosts, if still fresh."""
+    with _POOL_LOCK:
+        srv, parked = _POOL.pop(hosts, (None, 0))
+    if srv is not None and time.monotonic() - parked > SMTP_POOL_IDLE:
+        _smtp_close(srv)             # server has likely timed it out
+        return None
+    return srv
+
+def _smtp_checkin(hosts: tuple[str, ...], srv: smtplib.SMTP) -> None:
+    """
+    Park a session for reuse. Closed on the way: a session already parked
+    for the same hosts (a concurrent run got there first), any idle past
+    SMTP_POOL_IDLE, and the oldest while the pool is over SMTP_POOL_SIZE.
+    """
+    now = time.monotonic()
+    with _POOL_LOCK:
+        evicted = [_POOL.pop(hosts)[0]] if hosts in _POOL else []
+        evicted += [_POOL.pop(h)[0] for h, (_, parked) in list(_POOL.items())
+                    if now - parked > SMTP_POOL_IDLE]
+        _POOL[hosts] = (srv, now)
+        evicted += [_POOL.pop(next(iter(_POOL)))[0]
+                    for _ in range(len(_POOL) - SMTP_POOL_SIZE)]
+    for old in evicted:
+        _smtp_close(old)
+
+def probe_catch_all(mx: tuple[str, ...], domains) -> dict[str, str | bool | None]:
+    """
+    Catch-all test for every domain served by the same MX hosts (top two by
+    preference) over a single SMTP session: HELO once, then RSET + MAIL/RCPT
+    per domain. `domains` may be a live iterator, fed while DNS still runs.
+    The session comes from / goes back to the pool, so later runs skip the
+    connect + HELO; a reused session the server has dropped (or that timed
+    out with budget left) is reopened once.
+    Returns 'maybe' per domain when the server accepts a random address,
+    False when it refuses it, and None where no probe could be made.
+    Each domain adds PROBE_BUDGET seconds to the session deadline, so a slow
+    or tarpitting server can't stall the run; once the server fails, the
+    remaining domains stay None.
+    """
+    results = {}
+    deadline = time.monotonic()
+    srv, failed = _smtp_checkout(mx), False
+    for d in domains:
+        results[d] = None
+        if failed:
+            continue
+        deadline = max(deadline, time.monotonic()) + PROBE_BUDGET
+        try:
+            for attempt in range(2):             # reconnect once if dropped
+                try:
+                    fresh = srv is None
+                    if fresh:
+                        srv = _smtp_session(mx)
+                    srv.sock.settimeout(max(0.1, min(SMTP_TIMEOUT, deadline - time.monotonic())))
+                    if not fresh:
+                        srv.rset()               # clear previous MAIL/RCPT
+                    srv.mail(f"probe@{d}")
+                    fake = secrets.token_hex(8)  # 16 random chars, one C call
+                    code, _ = srv.rcpt(f"{fake}@{d}")
+                    results[d] = "maybe" if code == 250 else False
+                    break
+                except (smtplib.SMTPServerDisconnected, socket.timeout):
+                    if srv is not None:          # idle timeout, hung up on RSET,
+                        srv.close()              # or a reply that never came
+                        srv = None
+                    if attempt or fresh or time.monotonic() >= deadline:
+                        raise                    # a new session failing won't improve
+        except (OSError, UnicodeError):          # socket/smtplib errors, non-ASCII (IDN)
+            # commands smtplib can't encode; anything else is a bug and propagates
+            failed = True
+            if srv is not None:
+                _smtp_close(srv)
+                srv = None
+    if srv is not None:
+        _smtp_checkin(mx, srv)
+    for d, ca in results.items():
+        remember_catch_all(d, ca)
+    return results
+
+@functools.lru_cache(maxsize=10_000)
 def suggest_typo(domain: str) -> str | None:
-    return TYPO_MAP.get(domain)
+    """Listed typo fix, else the closest big provider for near-misses (gmial.com)."""
+    if domain in TYPO_MAP:
+        return TYPO_MAP[domain]
+    if domain in KNOWN_PROVIDERS or domain in NOT_TYPOS:
+        return None
+    close = difflib.get_close_matches(domain, KNOWN_PROVIDERS, n=1, cutoff=TYPO_CUTOFF)
+    return close[0] if close else None
+
+# -------------- DOMAIN CHECKS (once per domain) -------------
+@functools.lru_cache(maxsize=100_000)
+def parse_email(email: str) -> tuple[str, str] | None:
+    """
+    Return (local, domain), or None on invalid syntax.
+    Expects input already cleaned and lower-cased at ingestion.
+    """
+    try:
+        parsed = validate_email(email, check_deliverability=False)
+    except EmailNotValidError:
+        return None
+    return parsed["local"], parsed["domain"]
+
+async def check_domain(domain: str, sem: asyncio.Semaphore) -> tuple[bool, tuple[str, ...] | None]:
+    """
+    DNS checks for one domain → (blacklisted, MX hosts).
+    The MX lookup is skipped for blacklisted domains.
+    """
+    async with sem:
+        if await is_blacklisted(domain):
+            return True, ()
+        return False, await mx_hosts(domain)
+
+async def pipeline(domains, ex: ThreadPoolExecutor,
+                   on_dns=None, on_smtp=None) -> tuple[dict, dict, dict]:
+    """
+    DNS and SMTP as overlapping stages joined by an asyncio.Queue: a domain
+    goes to SMTP as soon as its own DNS is done, while the rest of the DNS
+    sweep (bounded by DNS_CONCURRENCY) carries on. Blacklisted / MX-less
+    domains never reach SMTP. SMTP runs on `ex`, one probe_catch_all
+    session per MX pair, fed through a queue.Queue.
+    Returns (blacklisted, MX hosts, catch-all) dicts keyed by domain;
+    `on_dns(n)` / `on_smtp(n, total)` are called for progress.
+    """
+    sem = asyncio.Semaphore(DNS_CONCURRENCY)
+    to_smtp: asyncio.Queue = asyncio.Queue(256)
+    bl, mx, ca = {}, {}, {}
+
+    async def one(d):
+        return d, await check_domain(d, sem)
+
+    async def stage_dns():
+        for idx, fut in enumerate(asyncio.as_completed([one(d) for d in domains])):
+            d, (bl[d], mx[d]) = await fut
+            if mx[d]:
+                await to_smtp.put(d)
+            if on_dns:
+                on_dns(idx+1)
+        await to_smtp.put(None)                  # DNS finished
+
+    async def stage_smtp():
+        feeds, sessions = {}, []
+        while (d := await to_smtp.get()) is not None:
+            hit = recall_catch_all(d)
+            if hit is not _MISS:
+                ca[d] = hit
+                continue
+            key = mx[d][:2]
+            if key not in feeds:                 # first domain for this MX pair
+                feeds[key] = queue.Queue()
+                sessions.append(asyncio.wrap_future(
+                    ex.submit(probe_catch_all, key, iter(feeds[key].get, None))))
+            feeds[key].put(d)
+        for feed in feeds.values():
+            feed.put(None)                       # let the sessions finish
+        for idx, fut in enumerate(asyncio.as_completed(sessions)):
+            ca.update(await fut)
+            if on_smtp:
+                on_smtp(idx+1, len(sessions))
+
+    await asyncio.gather(stage_dns(), stage_smtp())
+    return bl, mx, ca
+
+def domains_to_check(emails) -> set[str]:
+    """Unique domains that still need DNS/SMTP after the offline checks."""
+    domains = set()
+    for e in emails:
+        parsed = parse_email(e)
+        if (parsed and parsed[1] not in TYPO_MAP and parsed[1] not in DISPOSABLE_SET
+                and parsed[1] not in KNOWN_PROVIDERS):
+            domains.add(parsed[1])
+    return domains
 
 # -------------- SINGLE EMAIL CHECK ---------------------------
-def validate_one(email: str) -> tuple[str, list[str]]:
+def validate_one(email: str, bl: dict, mx: dict, ca: dict) -> tuple[str, list[str]]:
     """
     Returns status ('Okay'|'DoNot'|'Maybe') and a list of reasons.
+    `bl`, `mx` and `ca` hold the per-domain DNS and catch-all results,
+    so this is pure look-ups – no network.
     """
     reasons = []
-    email = email.strip().replace(";", "")
 
     # 1) syntax
-    try:
-        parsed = validate_email(email, check_deliverability=False)
-        domain = parsed["domain"].lower()
-        local  = parsed["local"].lower()
-    except EmailNotValidError:
+    parsed = parse_email(email)
+    if parsed is None:
         return "DoNot", ["Invalid syntax"]
+    local, domain = parsed
 
     # 2) obvious typo?
     if domain in TYPO_MAP:
@@ -127,30 +443,67 @@ def validate_one(email: str) -> tuple[str, list[str]]:
         reasons.append("Disposable / temporary domain")
         return "DoNot", reasons
 
+    # 3b) near-miss of a big provider? only a hint – real domains like
+    #     ymail.com look the same, so the checks below still decide
+    hint = suggest_typo(domain)
+    if hint:
+        reasons.append(f"Possible typo – did you mean **{hint}**?")
+
     # 4) role address?
     if local in ROLE_SET:
         reasons.append("Role-based address (info@, sales@, etc.)")
 
+    # 4b) major provider – nothing to learn from DNS / SMTP
+    if domain in KNOWN_PROVIDERS:
+        reasons.append("Major mailbox provider – SMTP probe skipped")
+        return "Okay", reasons
+
     # 5) domain reputation
-    if is_blacklisted(domain):
+    if bl.get(domain):
         reasons.append("Domain listed in Spamhaus DBL (malicious/spam)")
         return "DoNot", reasons
 
     # 6) MX present?
-    if not has_mx(domain):
+    if mx.get(domain) is None and domain in mx:
+        reasons.append("DNS did not answer – MX unknown")
+        return "Maybe", reasons
+    if not mx.get(domain):
         reasons.append("No MX records")
         return "DoNot", reasons
 
-    # 7) SMTP / catch-all
-    ca = is_catch_all(domain)
-    if ca == "maybe":
+    # 7) SMTP / catch-all – looked up once, then branch on it
+    probe = ca.get(domain)
+    if probe == "maybe":
         reasons.append("Catch-all domain – cannot confirm mailbox")
         return "Maybe", reasons
-    elif ca is False:
+    if probe is False:
         reasons.append("Mailbox accepted by server")  # passes SMTP
+        return "Okay", reasons
+    if probe is None and domain in ca:
+        reasons.append("SMTP probe failed – mailbox not verified")
+        return "Maybe", reasons
 
-    # final pass
-    return ("Okay" if "Mailbox accepted" in reasons else "DoNot"), reasons
+    # final pass: no SMTP verdict for this domain
+    return "DoNot", reasons
+
+@st.cache_data(show_spinner=False)
+def parse_csv(data: bytes) -> pd.DataFrame:
+    """Keyed on the upload's bytes, so reruns don't re-parse the file."""
+    return pd.read_csv(io.BytesIO(data), dtype={"email": "string"})
+
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Arrow's C++ writer straight into bytes – no intermediate Python str.
+    Uploaded columns mixing ints and strs can't become Arrow columns; those
+    frames fall back to pandas' writer.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df.to_csv(index=False).encode()
+    buf = io.BytesIO()
+    pcsv.write_csv(table, buf)
+    return buf.getvalue()
 
 # ────────────────  STREAMLIT UI  ─────────────────────────────
 st.set_page_config(page_title="Enhanced Email Verifier", layout="centered")
@@ -158,46 +511,86 @@ with st.sidebar:
     st.title("📬 Email Verifier 2.0")
     page = st.radio("Navigate", ["Verify", "How it works"])
 
+    st.caption("⚠️ Spamhaus refuses DBL look-ups sent through public "
+               "resolvers such as Google DNS (8.8.8.8).")
+    nameservers = st.text_input("DNS server(s), comma-separated",
+                                placeholder="system default",
+                                help="Point this at your own / ISP resolver "
+                                     "if DBL results come back refused.")
+    if nameservers.strip():
+        try:
+            _RES = _resolver(tuple(ns.strip() for ns in nameservers.split(",") if ns.strip()))
+        except ValueError:
+            st.error("Enter IP addresses (e.g. 192.168.1.1) or DNS-over-HTTPS "
+                     "URLs (e.g. https://dns.google/dns-query)")
+
 if page == "Verify":
     st.header("🔎 Verify E-mails with Extra Safety Checks")
     method = st.radio("Input method", ["Upload CSV", "Paste Emails"])
 
-    emails, df = [], None
+    df, uniq, src = None, None, None
     if method == "Upload CSV":
         up = st.file_uploader("CSV must include an **email** column", type="csv")
         if up:
-            df = pd.read_csv(up)
+            src = up.getvalue()
+            df = parse_csv(src)
             if "email" not in df.columns:
                 st.error("No 'email' column found.")
                 st.stop()
             st.caption("Preview:")
             st.dataframe(df.head())
-            emails = df["email"].astype(str).tolist()
     else:
         pasted = st.text_area("One e-mail per line")
         if pasted.strip():
+            src = pasted
             emails = [e.strip() for e in pasted.splitlines() if e.strip()]
             df = pd.DataFrame({"email": emails})
 
+    if df is not None:
+        # clean + lower-case once, vectorised; the checks rely on it
+        df["email"] = (df["email"].fillna("").astype("string").str.strip()
+                       .str.replace(";", "", regex=False).str.lower())
+        uniq = df["email"].drop_duplicates()                # unique order
+
     # -------- RUN VALIDATION --------
-    if emails and st.button("Check Emails"):
-        status_map, reason_map = {}, {}
-        pbar = st.progress(0)
-        for idx, e in enumerate(dict.fromkeys(emails)):     # unique order
-            stat, why = validate_one(e)
-            status_map[e]  = stat
-            reason_map[e]  = "; ".join(why)
-            pbar.progress((idx+1)/len(set(emails)))
-
-        final = df.copy()
-        final["validation_status"]   = final["email"].map(status_map).fillna("Check")
-        final["validation_analysis"] = final["email"].map(reason_map).fillna("")
-        final["validation_status"]   = final["validation_status"].apply(status_icon)
+    if uniq is not None and not uniq.empty and st.button("Check Emails"):
+        domains = domains_to_check(uniq)
+        pbar = st.progress(0, text="DNS checks…")
+        step = max(1, len(domains)//100)       # ~100 UI updates at most
+        half = 0.5 / max(1, len(domains))      # DNS fills the first half of the bar
+
+        def dns_progress(n):
+            if n % step == 0 or n == len(domains):
+                pbar.progress(n * half, text="DNS checks…")
+
+        def smtp_progress(n, total):
+            if n % max(1, total//100) == 0 or n == total:
+                pbar.progress(0.5 + 0.5 * n / total, text="SMTP checks…")
+
+        # network checks depend only on the domain → one DNS + SMTP pipeline
+        # over the unique domains; SMTP sessions run on threads
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            bl, mx, ca = asyncio.run(pipeline(domains, ex, dns_progress, smtp_progress))
+
+        verdicts = {e: validate_one(e, bl, mx, ca) for e in uniq}
+        pbar.progress(1.0)
+
+        # each original row picks its verdict by dict look-up (replaces old columns)
+        final  = df.drop(columns=["validation_status", "validation_analysis"], errors="ignore")
+        status = final["email"].map({e: stat for e, (stat, _) in verdicts.items()})
+        final["validation_status"]   = status.map(_ICONS).fillna(status)
+        final["validation_analysis"] = final["email"].map(
+            {e: "; ".join(why) for e, (_, why) in verdicts.items()})
+        # kept per session, so a rerun (download, page switch) doesn't drop it
+        st.session_state["verified"] = (hash(src), final)
 
+    last = st.session_state.get("verified")
+    if src is not None and last is not None and last[0] == hash(src):
+        final = last[1]
         st.success("Done!")
         st.dataframe(final)
 
-        csv = final.to_csv(index=False).encode()
+        csv = to_csv_bytes(final)
         st.download_button("📥 Download CSV", csv, "verified_emails.csv", "text/csv")
 
 else:  # How it works
@@ -214,5 +607,9 @@ else:  # How it works
 | **Catch-all Test** | Server accepts anything | Deliverability uncertain |
 | **SMTP Probe** | Mailbox exists | Final deliverability signal |
 """)
-    st.info("Lists refresh every 24 h and are cached in memory. "
-            "No data ever leaves your browser session.")
+    st.info("Lists refresh every 24 h and are cached in memory. Per-domain "
+            "results (MX, DBL, catch-all) are cached on the server's disk in "
+            f"`{DISK_CACHE_DIR}/` – MX for {MX_CACHE_TTL // 3600} h, DBL for "
+            f"{DBL_CACHE_TTL // 3600} h, catch-all for {CA_CACHE_TTL // 3600} h, "
+            f"failed look-ups for {RETRY_TTL // 60} min – and shared by all "
+            "sessions and restarts. Open SMTP connections are pooled per server process.")